@@ -1,14 +1,66 @@
 import streamlit as st
 import pandas as pd
-from docx import Document
-from docx.shared import RGBColor, Pt
-from docx.oxml.ns import qn
-from docx.oxml import OxmlElement
-from docx.enum.table import WD_ALIGN_VERTICAL
-from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+import hashlib
 import io
 import os
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+# Prefer the Rust-based calamine parser; fall back to openpyxl if it isn't installed
+try:
+    from python_calamine import CalamineWorkbook
+    EXCEL_ENGINE = "calamine"
+except ImportError:
+    CalamineWorkbook = None
+    EXCEL_ENGINE = "openpyxl"
+
+# Only these columns of the raw coverage sheet are used by preprocessing
+PREPROCESS_COLUMNS = {
+    'Gene Name', 'Gene Names', 'Aliases', 'Name', 'Gene IDs',
+    'Counted Bases', 'Mean Depth', 'Min Depth', 'Max Depth', '% 1x',
+}
+
+# Preprocessed coverage tables can also be cached on disk, keyed by the file's hash,
+# so they survive server restarts and are shared between workers. The tables are
+# patient-derived, so this is opt-in: set GENEPANEL_DISK_CACHE=1 to enable it.
+# Bump the version whenever preprocessing output changes.
+DISK_CACHE = os.environ.get("GENEPANEL_DISK_CACHE") == "1"
+CACHE_DIR = Path(".cache")
+CACHE_VERSION = 6
+
+# Set GENEPANEL_DEBUG=1 to show intermediate tables while processing
+DEBUG = os.environ.get("GENEPANEL_DEBUG") == "1"
+
+# Separators accepted in a pasted gene list
+GENE_LIST_SEPARATOR = re.compile(r'[\s,;]+')
+
+# Word table formatting, built once instead of for every cell. python-docx is only
+# imported when a report is generated, so these are plain values.
+TABLE_FONT = 'Calibri'
+TABLE_FONT_SIZE = 8  # points
+W_NAMESPACE = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+TABLE_STYLE = 'Tight'  # paragraph style carrying the table's font, size and spacing
+LOW_COVERAGE_COLOR = 'FF0000'
+EMPTY_CELL_COLOR = 'FFFFFF'
+
+# View Genes highlight for low-coverage rows
+LOW_COVERAGE_CSS = 'background-color: #f8d7da; color: #721c24; font-weight: bold'
+
+# Run properties for each kind of table cell, as ready-made <w:rPr> fragments
+RPR_GENE = '<w:rPr><w:i/></w:rPr>'
+RPR_GENE_LOW = f'<w:rPr><w:i/><w:color w:val="{LOW_COVERAGE_COLOR}"/></w:rPr>'
+RPR_PERCENT = ''
+RPR_PERCENT_LOW = f'<w:rPr><w:color w:val="{LOW_COVERAGE_COLOR}"/></w:rPr>'
+RPR_EMPTY = f'<w:rPr><w:color w:val="{EMPTY_CELL_COLOR}"/></w:rPr>'
+TABLE_BORDERS_XML = (
+    f'<w:tblBorders xmlns:w="{W_NAMESPACE}">'
+    + ''.join(f'<w:{side} w:val="single" w:sz="4" w:space="0" w:color="000000"/>'
+              for side in ('top', 'left', 'bottom', 'right', 'insideH', 'insideV'))
+    + '</w:tblBorders>'
+)
 
 # Page config MUST be first
 st.set_page_config(
@@ -42,96 +94,260 @@ if 'last_processed_file' not in st.session_state:
     st.session_state.last_processed_file = None
 if 'mito_data' not in st.session_state:
     st.session_state.mito_data = None
-
-@st.cache_data
-def extract_gene_name(name):
-    """Extract the first gene name from comma or semicolon-separated names."""
-    if isinstance(name, str):
-        if ',' in name:
-            return name.split(',')[0]
-        elif ';' in name:
-            return name.split(';')[0]
-        return name
-    return None
+if 'last_panel_file' not in st.session_state:
+    st.session_state.last_panel_file = None
+if 'panel_file_genes' not in st.session_state:
+    st.session_state.panel_file_genes = None
 
 def parse_gene_list(text):
-    """Parse gene list with support for newlines, commas, and spaces. Remove duplicates."""
-    if not text.strip():
-        return []
-    
-    # Replace newlines and commas with spaces
-    text = text.replace('\n', ' ').replace(',', ' ').replace('\t', ' ')
+    """Parse gene list with support for newlines, commas, semicolons, and spaces.
+
+    Returns the unique genes in order of first appearance and the number of duplicates removed.
+    """
+    # Split on any run of whitespace/commas/semicolons, then de-duplicate preserving order
+    genes = [gene for gene in GENE_LIST_SEPARATOR.split(text.strip()) if gene]
+    unique_genes = list(dict.fromkeys(genes))
+    return unique_genes, len(genes) - len(unique_genes)
+
+def read_coverage_sheet(file_bytes, skip_rows=1):
+    """Read the PREPROCESS_COLUMNS of the first sheet of a raw coverage workbook.
+
+    With python-calamine the rows are streamed and only the needed cells are kept,
+    so unused columns are never turned into Python objects.
+    """
+    if CalamineWorkbook is None:
+        return pd.read_excel(
+            io.BytesIO(file_bytes),
+            skiprows=skip_rows,
+            engine=EXCEL_ENGINE,
+            usecols=lambda col: col in PREPROCESS_COLUMNS
+        )
     
-    # Split by whitespace and filter empty strings
-    genes = [gene.strip() for gene in text.split() if gene.strip()]
+    sheet = CalamineWorkbook.from_filelike(io.BytesIO(file_bytes)).get_sheet_by_index(0)
+    rows = sheet.iter_rows()
+    for _ in range(skip_rows):
+        next(rows, None)
     
-    # Remove duplicates while preserving order
-    seen = set()
-    unique_genes = []
-    for gene in genes:
-        if gene not in seen:
-            seen.add(gene)
-            unique_genes.append(gene)
+    header = next(rows, [])
+    # Only the first column of a repeated name is used, as read_excel keeps it under the
+    # plain name and renames later repeats to 'Name.1' etc.
+    keep = {}
+    for i, col in enumerate(header):
+        if col in PREPROCESS_COLUMNS and col not in keep:
+            keep[col] = i
+    columns = {col: [] for col in keep}
+    for row in rows:
+        for col, i in keep.items():
+            value = row[i]
+            if value == '':
+                value = None
+            elif isinstance(value, float) and value.is_integer():
+                # calamine returns every number as a float; restore integral cells like read_excel does
+                value = int(value)
+            columns[col].append(value)
     
-    return unique_genes
+    return pd.DataFrame(columns)
 
 @st.cache_data(show_spinner=False)
 def preprocess_excel_cached(file_bytes, file_name, skip_rows=1):
-    """Cached preprocessing to avoid re-computation"""
+    """Cached preprocessing to avoid re-computation.
+    
+    Returns the coverage table as Parquet bytes: st.cache_data pickles its value on
+    every write and read, and bytes pickle far faster than an object-dtype DataFrame.
+    """
+    base_name = os.path.splitext(file_name)[0]
+    file_hash = hashlib.sha256(file_bytes).hexdigest()
+    cache_path = CACHE_DIR / f"{file_hash}_{skip_rows}_v{CACHE_VERSION}.parquet" if DISK_CACHE else None
+    
+    if cache_path is not None and cache_path.exists():
+        coverage_bytes = cache_path.read_bytes()
+        # Parquet files start and end with this magic - anything else is a truncated write
+        if coverage_bytes[:4] == b'PAR1' and coverage_bytes[-4:] == b'PAR1':
+            return coverage_bytes, base_name
+    
     try:
-        data = pd.read_excel(io.BytesIO(file_bytes), skiprows=skip_rows)
+        data = read_coverage_sheet(file_bytes, skip_rows)
         
         if 'Gene Name' not in data.columns:
             raise ValueError("Column 'Gene Name' not found")
         
-        data['Gene_Name'] = data['Gene Name'].apply(extract_gene_name)
+        # First name of a comma or semicolon-separated list
+        data['Gene_Name'] = data['Gene Name'].astype('string[pyarrow]').str.split(r'[,;]', n=1, regex=True).str[0]
+        # Identifier cells can mix text and numbers; make them uniformly Arrow-backed
+        # strings so the key fallback and the groupby below run in C++
+        for col in ('Gene Names', 'Aliases', 'Name', 'Gene IDs'):
+            if col in data.columns:
+                data[col] = data[col].astype('string[pyarrow]')
         
-        result = []
-        identifiers = data[['Gene Names', 'Aliases', 'Gene_Name']].fillna('')
-        unique_ids = identifiers.drop_duplicates()
+        # Each row belongs to its first non-empty identifier: Gene Names, then Aliases, then Gene_Name
+        key = data['Gene Names']
+        for fallback in ('Aliases', 'Gene_Name'):
+            key = key.where(key.notna() & (key != ''), data[fallback])
+        data['_key'] = key.where(key != '')  # rows without any identifier are dropped by groupby
         
-        for _, row in unique_ids.iterrows():
-            gene = row['Gene Names']
-            alias = row['Aliases']
-            name = row['Gene_Name']
-            
-            if gene:
-                gene_data = data[data['Gene Names'] == gene]
-            elif alias:
-                gene_data = data[data['Aliases'] == alias]
-            elif name:
-                gene_data = data[data['Name'] == name]
-            else:
-                continue
-            
-            total_counted_bases = gene_data['Counted Bases'].sum()
-            if total_counted_bases == 0:
-                continue
-            
-            mean_depth = (gene_data['Mean Depth'] * gene_data['Counted Bases']).sum() / total_counted_bases
-            mean_1x = (gene_data['% 1x'] * gene_data['Counted Bases']).sum() / total_counted_bases
-            
-            summary = {
-                'Region': 'total',
-                'Ref Name': gene if gene else None,
-                'Aliases': alias if alias else None,
-                'Gene_Name': name if name else None,
-                'Name': gene_data['Name'].iloc[0] if 'Name' in gene_data.columns else None,
-                'Gene IDs': gene_data['Gene IDs'].iloc[0] if 'Gene IDs' in gene_data.columns else None,
-                'Counted Bases': total_counted_bases,
-                'Mean Depth': mean_depth,
-                'Min Depth': gene_data['Min Depth'].min(),
-                'Max Depth': gene_data['Max Depth'].max(),
-                '% 1x': mean_1x,
-            }
-            result.append(summary)
+        # Integer counts are downcast losslessly to halve the bytes the groupby scans; the
+        # sums still accumulate in int64, and the float columns stay float64 so the weighted
+        # means match to the last digit
+        for col in ('Counted Bases', 'Min Depth', 'Max Depth'):
+            if pd.api.types.is_integer_dtype(data[col]):
+                data[col] = pd.to_numeric(data[col], downcast='integer')
+        
+        data['_wdepth'] = data['Mean Depth'] * data['Counted Bases']
+        data['_w1x'] = data['% 1x'] * data['Counted Bases']
+        
+        aggregations = {
+            'ref_name': ('Gene Names', 'first'),
+            'aliases': ('Aliases', 'first'),
+            'gene_name': ('Gene_Name', 'first'),
+            'counted_bases': ('Counted Bases', 'sum'),
+            'weighted_depth': ('_wdepth', 'sum'),
+            'weighted_1x': ('_w1x', 'sum'),
+            'min_depth': ('Min Depth', 'min'),
+            'max_depth': ('Max Depth', 'max'),
+        }
+        for col in ('Name', 'Gene IDs'):
+            if col in data.columns:
+                aggregations[col] = (col, 'first')
+        
+        summary = data.groupby('_key', sort=False, observed=True).agg(**aggregations)
+        summary = summary[summary['counted_bases'] != 0]
+        # pandas keeps the downcast type when every group has one row; a float column
+        # (blank cells) was never downcast and keeps its float sums
+        counted_bases = summary['counted_bases']
+        if pd.api.types.is_integer_dtype(counted_bases):
+            counted_bases = counted_bases.astype('int64')
         
-        coverage_df = pd.DataFrame(result)
-        base_name = os.path.splitext(file_name)[0]
+        coverage_df = pd.DataFrame({
+            'Region': 'total',
+            'Ref Name': summary['ref_name'],
+            'Aliases': summary['aliases'],
+            'Gene_Name': summary['gene_name'],
+            'Name': summary.get('Name'),
+            'Gene IDs': summary.get('Gene IDs'),
+            'Counted Bases': counted_bases,
+            'Mean Depth': summary['weighted_depth'] / summary['counted_bases'],
+            'Min Depth': summary['min_depth'],
+            'Max Depth': summary['max_depth'],
+            '% 1x': summary['weighted_1x'] / summary['counted_bases'],
+        }, index=summary.index).reset_index(drop=True)
         
-        return coverage_df, base_name
+        buffer = io.BytesIO()
+        coverage_df.to_parquet(buffer, compression="zstd", index=False)
+        coverage_bytes = buffer.getvalue()
     except Exception as e:
         raise Exception(f"Error: {str(e)}")
+    
+    # Disk cache is best-effort (e.g. read-only filesystem); writing to a temporary
+    # file and renaming means other workers never see a half-written table
+    if cache_path is not None:
+        try:
+            CACHE_DIR.mkdir(exist_ok=True)
+            tmp_path = cache_path.with_suffix(f".{os.getpid()}-{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(coverage_bytes)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass
+    
+    return coverage_bytes, base_name
+
+def use_arrow_strings(df, columns=('Gene_Name', 'Ref Name')):
+    """Store gene identifier columns as Arrow-backed strings so panel matching runs in C++"""
+    for col in columns:
+        if col in df.columns:
+            df[col] = df[col].astype('string[pyarrow]')
+    return df
+
+@st.cache_data(show_spinner=False)
+def compute_grouped(df, panel_genes):
+    """Filter coverage data to the panel genes and average coverage per gene (cached across reruns)"""
+    panel_genes = frozenset(panel_genes)
+    
+    # Panel match and intron exclusion in a single mask
+    gene_ids = df['Gene_Name'].fillna(df['Ref Name'])
+    in_panel = df['Gene_Name'].isin(panel_genes) | df['Ref Name'].isin(panel_genes)
+    mask = in_panel & ~gene_ids.str.startswith("Intron:", na=False)
+    # Only the two columns the groupby needs are materialized
+    df_filtered = pd.DataFrame({
+        'Gene_ID': gene_ids[mask].astype('category'),  # groupby on integer codes
+        # float64 on both paths below - groupby mean always returned floats, and integer
+        # coverage would otherwise be written as 100 instead of 100.0
+        'Perc_1x': pd.to_numeric(df.loc[mask, '% 1x'], errors='coerce').astype('float64'),
+    }).dropna(subset=['Gene_ID'])
+    
+    # Categories are already sorted, so both paths return genes in alphabetical order
+    if df_filtered['Gene_ID'].is_unique:
+        # One row per gene already (the preprocessed case): the mean is the value itself
+        df_grouped = df_filtered.sort_values('Gene_ID', ignore_index=True)
+    else:
+        df_grouped = df_filtered.groupby('Gene_ID', as_index=False, observed=True, sort=True)['Perc_1x'].mean()
+    df_grouped['Perc_1x'] = df_grouped['Perc_1x'].round(2)
+    
+    return df_grouped
+
+@st.cache_data(show_spinner=False)
+def read_coverage_csv(file_bytes):
+    """Read a coverage CSV with stripped column names (cached on the file's bytes)"""
+    df = pd.read_csv(io.BytesIO(file_bytes))
+    df.columns = [str(col).strip() for col in df.columns]
+    return df
+
+@st.cache_data(show_spinner=False)
+def read_mito_sheet(file_bytes):
+    """Read a mitochondrial coverage workbook, header in row 2 (cached on the file's bytes)"""
+    return pd.read_excel(io.BytesIO(file_bytes), header=1, engine=EXCEL_ENGINE)
+
+def parse_panel_genes(file_bytes):
+    """Read unique genes from the GENE column of a panel Excel file (None if the column is missing)"""
+    panel_df = pd.read_excel(
+        io.BytesIO(file_bytes),
+        engine=EXCEL_ENGINE,
+        usecols=lambda col: col == 'GENE',
+        dtype={'GENE': 'string'}
+    )
+    if 'GENE' not in panel_df.columns:
+        return None
+    return pd.unique(panel_df['GENE'].dropna()).tolist()
+
+@st.cache_data(show_spinner=False)
+def read_panel_genes(file_bytes):
+    """Cached parse_panel_genes for the script thread (worker threads call parse_panel_genes directly)"""
+    return parse_panel_genes(file_bytes)
+
+def store_panel_genes(panel_id, genes):
+    """Remember the genes read from a panel file so it is only parsed once"""
+    st.session_state.last_panel_file = panel_id
+    st.session_state.panel_file_genes = genes
+    if genes is not None:
+        st.session_state.panel_genes = genes
+
+def build_cell_xml(text, width=None, rpr=''):
+    """Build a centred table cell (<w:tc>) in the TABLE_STYLE paragraph style holding one run of text"""
+    tc_width = f'<w:tcW w:type="dxa" w:w="{width}"/>' if width is not None else ''
+    return (
+        f'<w:tc><w:tcPr>{tc_width}<w:vAlign w:val="center"/></w:tcPr>'
+        f'<w:p><w:pPr><w:pStyle w:val="{TABLE_STYLE}"/><w:jc w:val="center"/></w:pPr>'
+        f'<w:r>{rpr}<w:t>{escape(text)}</w:t></w:r></w:p></w:tc>'
+    )
+
+@st.cache_resource
+def blank_docx_bytes():
+    """Blank report template (python-docx default plus the table paragraph style), built once per process"""
+    from docx import Document
+    from docx.enum.style import WD_STYLE_TYPE
+    from docx.oxml.ns import qn
+    from docx.shared import Pt
+    
+    doc = Document()
+    style = doc.styles.add_style(TABLE_STYLE, WD_STYLE_TYPE.PARAGRAPH)
+    style.base_style = doc.styles['Normal']
+    style.paragraph_format.space_after = Pt(0)
+    style.font.name = TABLE_FONT
+    style.element.rPr.rFonts.set(qn('w:eastAsia'), TABLE_FONT)
+    style.font.size = Pt(TABLE_FONT_SIZE)
+    
+    doc_bytes = io.BytesIO()
+    doc.save(doc_bytes)
+    return doc_bytes.getvalue()
 
 def create_word_document(df_grouped, output_filename):
     """Create Word document with gene coverage table (legacy function - uses Perc_1x)"""
@@ -144,11 +360,13 @@ def create_word_document(df_grouped, output_filename):
 
 def create_word_document_with_mito(df_data, output_filename):
     """Create Word document with gene coverage table - works with mito or regular data"""
+    # Imported here so reruns that never build a report don't pay for python-docx/lxml
+    from docx import Document
+    from docx.oxml import OxmlElement, parse_xml
+    from docx.oxml.ns import nsdecls
+    from docx.shared import Pt
     
-    # IMPORTANT: Reset the index to avoid iloc issues
-    df_data = df_data.reset_index(drop=True)
-    
-    doc = Document()
+    doc = Document(io.BytesIO(blank_docx_bytes()))
     doc.add_heading('Appendix 1: Gene Coverage', 1)
     doc.add_heading('Indication Based Analysis:', 2)
     
@@ -156,102 +374,318 @@ def create_word_document_with_mito(df_data, output_filename):
     spacer.paragraph_format.space_after = Pt(0)
     
     chunk_size = 4
-    chunks = [df_data[i:i+chunk_size] for i in range(0, len(df_data), chunk_size)]
+    # Flat arrays converted once - a duplicated '% 1x' column resolves to the first one
+    df_data = df_data.loc[:, ~df_data.columns.duplicated()]
+    gene_ids = df_data['Gene_ID'].astype(str).to_numpy()
+    percents = pd.to_numeric(df_data['% 1x'], errors='coerce').fillna(0.0).to_numpy()
+    low_coverage = percents < 90
+    n_genes = len(gene_ids)
     
-    table = doc.add_table(rows=1, cols=chunk_size*2)
+    table = doc.add_table(rows=0, cols=chunk_size*2)
     table.alignment = 1
-    hdr_cells = table.rows[0].cells
     
+    # All rows are written as raw WordprocessingML and parsed in one go - building
+    # them cell by cell through python-docx gets very slow for large panels
+    widths = [gridCol.w.twips if gridCol.w is not None else None
+              for gridCol in table._tbl.tblGrid.gridCol_lst]
+    header_xml = []
     for i in range(chunk_size):
-        gene_hdr_cell = hdr_cells[i*2]
-        gene_hdr_cell.vertical_alignment = WD_ALIGN_VERTICAL.CENTER
-        gene_hdr_para = gene_hdr_cell.paragraphs[0]
-        gene_hdr_para.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-        gene_hdr_para.paragraph_format.space_after = Pt(0)
-        gene_hdr_run = gene_hdr_para.add_run("Gene Name")
-        gene_hdr_run.font.name = 'Calibri'
-        gene_hdr_run._element.rPr.rFonts.set(qn('w:eastAsia'), 'Calibri')
-        gene_hdr_run.font.size = Pt(8)
-        
-        perc_hdr_cell = hdr_cells[i*2+1]
-        perc_hdr_cell.vertical_alignment = WD_ALIGN_VERTICAL.CENTER
-        perc_hdr_para = perc_hdr_cell.paragraphs[0]
-        perc_hdr_para.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-        perc_hdr_para.paragraph_format.space_after = Pt(0)
-        perc_hdr_run = perc_hdr_para.add_run("Percentage of coding region covered")
-        perc_hdr_run.font.name = 'Calibri'
-        perc_hdr_run._element.rPr.rFonts.set(qn('w:eastAsia'), 'Calibri')
-        perc_hdr_run.font.size = Pt(8)
-    
-    for chunk in chunks:
-        # IMPORTANT: Reset index for each chunk too
-        chunk = chunk.reset_index(drop=True)
-        
-        row_cells = table.add_row().cells
+        header_xml.append(build_cell_xml("Gene Name", widths[i*2]))
+        header_xml.append(build_cell_xml("Percentage of coding region covered", widths[i*2+1]))
+    rows_xml = [f"<w:tr>{''.join(header_xml)}</w:tr>"]
+    
+    for start in range(0, n_genes, chunk_size):
+        cells_xml = []
         for i in range(chunk_size):
-            if i < len(chunk):
-                row = chunk.iloc[i]
-                gene = str(row['Gene_ID'])
+            if start + i < n_genes:
+                gene = gene_ids[start + i]
+                percent = percents[start + i]
                 
-                # Get the percentage value - now using the correct index
-                percent_value = row['% 1x']
-                if isinstance(percent_value, pd.Series):
-                    percent = float(percent_value.iloc[0])
+                if low_coverage[start + i]:
+                    cells_xml.append(build_cell_xml(gene, widths[i*2], RPR_GENE_LOW))
+                    cells_xml.append(build_cell_xml(str(percent), widths[i*2+1], RPR_PERCENT_LOW))
                 else:
-                    percent = float(percent_value) if pd.notna(percent_value) else 0.0
-                
-                gene_cell = row_cells[i*2]
-                gene_cell.vertical_alignment = WD_ALIGN_VERTICAL.CENTER
-                gene_para = gene_cell.paragraphs[0]
-                gene_para.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-                gene_para.paragraph_format.space_after = Pt(0)
-                gene_run = gene_para.add_run(gene)
-                gene_run.font.name = 'Calibri'
-                gene_run._element.rPr.rFonts.set(qn('w:eastAsia'), 'Calibri')
-                gene_run.font.size = Pt(8)
-                gene_run.italic = True
-                if percent < 90:
-                    gene_run.font.color.rgb = RGBColor(255, 0, 0)
-                
-                perc_cell = row_cells[i*2+1]
-                perc_cell.vertical_alignment = WD_ALIGN_VERTICAL.CENTER
-                perc_para = perc_cell.paragraphs[0]
-                perc_para.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-                perc_para.paragraph_format.space_after = Pt(0)
-                perc_run = perc_para.add_run(str(percent))
-                perc_run.font.name = 'Calibri'
-                perc_run._element.rPr.rFonts.set(qn('w:eastAsia'), 'Calibri')
-                perc_run.font.size = Pt(8)
-                if percent < 90:
-                    perc_run.font.color.rgb = RGBColor(255, 0, 0)
+                    cells_xml.append(build_cell_xml(gene, widths[i*2], RPR_GENE))
+                    cells_xml.append(build_cell_xml(str(percent), widths[i*2+1], RPR_PERCENT))
             else:
-                for empty_cell in [row_cells[i*2], row_cells[i*2+1]]:
-                    empty_cell.vertical_alignment = WD_ALIGN_VERTICAL.CENTER
-                    para = empty_cell.paragraphs[0]
-                    para.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-                    para.paragraph_format.space_after = Pt(0)
-                    run = para.add_run("–")
-                    run.font.name = 'Calibri'
-                    run._element.rPr.rFonts.set(qn('w:eastAsia'), 'Calibri')
-                    run.font.size = Pt(8)
-                    run.font.color.rgb = RGBColor(255, 255, 255)
+                cells_xml.append(build_cell_xml("–", widths[i*2], RPR_EMPTY))
+                cells_xml.append(build_cell_xml("–", widths[i*2+1], RPR_EMPTY))
+        rows_xml.append(f"<w:tr>{''.join(cells_xml)}</w:tr>")
+    
+    parsed = parse_xml(f"<w:tbl {nsdecls('w')}>{''.join(rows_xml)}</w:tbl>")
+    table._tbl.extend(list(parsed))
     
     tbl = table._tbl
     tblPr = tbl.tblPr
     if tblPr is None:
         tblPr = OxmlElement('w:tblPr')
         tbl.append(tblPr)
-    tblBorders = OxmlElement('w:tblBorders')
-    for border_name in ('top', 'left', 'bottom', 'right', 'insideH', 'insideV'):
-        border = OxmlElement(f'w:{border_name}')
-        border.set(qn('w:val'), 'single')
-        border.set(qn('w:sz'), '4')
-        border.set(qn('w:space'), '0')
-        border.set(qn('w:color'), '000000')
-        tblBorders.append(border)
-    tblPr.append(tblBorders)
+    tblPr.append(parse_xml(TABLE_BORDERS_XML))
+    
+    return doc
+
+@st.cache_data(show_spinner=False)
+def create_word_bytes(df_data, output_filename):
+    """Build the Word report as .docx bytes (cached, so repeated clicks don't rebuild it)"""
+    doc = create_word_document_with_mito(df_data, output_filename)
+    doc_bytes = io.BytesIO()
+    doc.save(doc_bytes)
+    return doc_bytes.getvalue()
+
+@st.cache_data(show_spinner=False)
+def df_to_csv_bytes(df):
+    """Serialize a DataFrame to UTF-8 CSV bytes (cached across reruns)"""
+    return df.to_csv(index=False).encode('utf-8')
+
+def highlight_low_coverage(df):
+    """Cell styles for the View Genes table: genes below 90% coverage in red"""
+    css = (df['Perc_1x'] < 90).map({True: LOW_COVERAGE_CSS, False: ''})
+    return pd.DataFrame({col: css for col in df.columns}, index=df.index)
+
+def generate_html_report(df, patient_name):
+    """Generate interactive HTML report"""
+    
+    # Get gene column name
+    gene_col = 'Gene_ID' if 'Gene_ID' in df.columns else 'Gene_Name' if 'Gene_Name' in df.columns else df.columns[0]
+    coverage_col = 'Perc_1x' if 'Perc_1x' in df.columns else 'Coverage' if 'Coverage' in df.columns else df.columns[1]
+    
+    table_rows = '\n'.join(
+        f"<tr><td>{n}</td><td>{gene}</td><td>{coverage}</td></tr>"
+        for n, gene, coverage in zip(range(1, len(df) + 1), df[gene_col].to_numpy(), df[coverage_col].to_numpy())
+    )
+    avg_coverage = df[coverage_col].mean() if coverage_col in df.columns else 0
+    
+    html = f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+  <meta charset="UTF-8">
+  <meta name="viewport" content="width=device-width, initial-scale=1.0">
+  <title>Gene Coverage Report - {patient_name}</title>
+  <style>
+    body {{
+      margin: 0;
+      font-family: Arial, sans-serif;
+      background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+      padding: 20px;
+    }}
+    .container {{
+      max-width: 1200px;
+      margin: 0 auto;
+      background: white;
+      border-radius: 15px;
+      padding: 30px;
+      box-shadow: 0 20px 60px rgba(0,0,0,0.3);
+    }}
+    .header {{
+      text-align: center;
+      margin-bottom: 30px;
+      padding-bottom: 20px;
+      border-bottom: 3px solid #667eea;
+    }}
+    .header h1 {{
+      color: #667eea;
+      margin: 0;
+      font-size: 2em;
+    }}
+    .patient-name {{
+      color: #666;
+      font-size: 1.2em;
+      margin-top: 10px;
+    }}
+    .controls {{
+      margin: 20px 0;
+      display: flex;
+      gap: 10px;
+      flex-wrap: wrap;
+      justify-content: center;
+    }}
+    input[type="text"] {{
+      padding: 10px 15px;
+      font-size: 14px;
+      border: 2px solid #667eea;
+      border-radius: 8px;
+      min-width: 300px;
+    }}
+    button {{
+      padding: 10px 20px;
+      background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+      color: white;
+      border: none;
+      border-radius: 8px;
+      cursor: pointer;
+      font-size: 14px;
+      font-weight: 600;
+      transition: transform 0.2s;
+    }}
+    button:hover {{
+      transform: translateY(-2px);
+      box-shadow: 0 5px 15px rgba(102, 126, 234, 0.4);
+    }}
+    .table-wrapper {{
+      max-height: 600px;
+      overflow-y: auto;
+      border: 2px solid #667eea;
+      border-radius: 10px;
+      margin-top: 20px;
+    }}
+    table {{
+      border-collapse: collapse;
+      width: 100%;
+    }}
+    th, td {{
+      border: 1px solid #dee2e6;
+      padding: 12px;
+      text-align: center;
+      font-size: 14px;
+    }}
+    th {{
+      background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+      color: white;
+      position: sticky;
+      top: 0;
+      font-weight: 600;
+      z-index: 10;
+    }}
+    tr:nth-child(even) {{
+      background-color: #f8f9fa;
+    }}
+    tr:hover {{
+      background-color: #e9ecef;
+    }}
+    .stats {{
+      display: flex;
+      gap: 20px;
+      justify-content: center;
+      margin: 20px 0;
+    }}
+    .stat-box {{
+      background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+      color: white;
+      padding: 15px 30px;
+      border-radius: 10px;
+      text-align: center;
+    }}
+    .stat-box h3 {{
+      margin: 0;
+      font-size: 2em;
+    }}
+    .stat-box p {{
+      margin: 5px 0 0 0;
+      opacity: 0.9;
+    }}
+    @media only screen and (max-width: 600px) {{
+      .table-wrapper {{ max-height: 400px; }}
+      table {{ font-size: 12px; }}
+      .stats {{ flex-direction: column; }}
+    }}
+  </style>
+</head>
+<body>
+  <div class="container">
+    <div class="header">
+      <h1>🧬 Gene Coverage Report</h1>
+      <div class="patient-name">{patient_name}</div>
+    </div>
+
+    <div class="stats">
+      <div class="stat-box">
+        <h3 id="totalGenes">{len(df)}</h3>
+        <p>Total Genes</p>
+      </div>
+      <div class="stat-box">
+        <h3 id="avgCoverage">{avg_coverage:.2f}%</h3>
+        <p>Average Coverage</p>
+      </div>
+    </div>
+
+    <div class="controls">
+      <input type="text" id="searchInput" placeholder="🔍 Search by Gene..." />
+      <button onclick="sortTable(true)">↑ Ascending</button>
+      <button onclick="sortTable(false)">↓ Descending</button>
+      <button onclick="downloadCSV()">📥 Download CSV</button>
+    </div>
+
+    <div class="table-wrapper">
+      <table id="dataTable">
+        <thead>
+          <tr>
+            <th>S.No</th>
+            <th>Gene</th>
+            <th>Coverage (%)</th>
+          </tr>
+        </thead>
+        <tbody>
+          {table_rows}
+        </tbody>
+      </table>
+    </div>
+  </div>
+
+  <script>
+    const searchInput = document.getElementById('searchInput');
+    const tbody = document.querySelector('tbody');
+    let rows = Array.from(tbody.querySelectorAll('tr'));
+
+    // Lowercased gene and coverage text, built once per row instead of on every keystroke
+    rows.forEach(row => {{
+      row.searchText = (row.cells[1].textContent + '\\n' + row.cells[2].textContent).toLowerCase();
+    }});
+
+    let searchTimer;
+    searchInput.addEventListener('keyup', function(e) {{
+      clearTimeout(searchTimer);
+      searchTimer = setTimeout(() => {{
+        const searchText = e.target.value.toLowerCase();
+        rows.forEach(row => {{
+          row.style.display = row.searchText.includes(searchText) ? '' : 'none';
+        }});
+        updateStats();
+      }}, 50);
+    }});
+
+    function sortTable(ascending) {{
+      const sortedRows = rows.slice().sort((a, b) => {{
+        const aVal = parseFloat(a.cells[2].textContent) || 0;
+        const bVal = parseFloat(b.cells[2].textContent) || 0;
+        return ascending ? aVal - bVal : bVal - aVal;
+      }});
+      sortedRows.forEach((row, i) => {{
+        row.cells[0].textContent = i + 1;
+        tbody.appendChild(row);
+      }});
+      rows = sortedRows;
+    }}
+
+    function updateStats() {{
+      const visible = rows.filter(row => row.style.display !== 'none');
+      document.getElementById('totalGenes').textContent = visible.length;
+    }}
+
+    function downloadCSV() {{
+      const visible = rows.filter(row => row.style.display !== 'none');
+      let csv = "S.No,Gene,Coverage\\n";
+      visible.forEach(row => {{
+        const cells = Array.from(row.cells).map(c => '"' + c.textContent.trim() + '"');
+        csv += cells.join(',') + '\\n';
+      }});
+      const blob = new Blob([csv], {{ type: 'text/csv' }});
+      const link = document.createElement('a');
+      link.href = URL.createObjectURL(blob);
+      link.download = 'coverage_{patient_name}.csv';
+      link.click();
+    }}
+  </script>
+</body>
+</html>"""
     
-    return doc
+    return html
+
+def build_batch_report(csv_file):
+    """Read one uploaded CSV and render its HTML report, returning (archive name, html)"""
+    df = pd.read_csv(csv_file)
+    patient_name = os.path.splitext(csv_file.name)[0]
+    safe_filename = patient_name.replace(' ', '_').replace('/', '_')
+    return f"coverage_{safe_filename}.html", generate_html_report(df, patient_name)
 
 # Main UI
 st.title("🧬 Gene Coverage Analyzer")
@@ -281,12 +715,29 @@ with col1:
                 try:
                     progress.progress(30, "Processing...")
                     file_bytes = raw_excel.read()
-                    coverage_df, basename = preprocess_excel_cached(file_bytes, raw_excel.name)
+                    
+                    # Read a freshly uploaded panel file in the background while the coverage parses;
+                    # the worker calls the uncached parser, as st.cache_data needs the script's run context
+                    panel_file = st.session_state.get('panel')
+                    panel_id = f"{panel_file.name}_{panel_file.size}" if panel_file else None
+                    with ThreadPoolExecutor(max_workers=1) as executor:
+                        panel_future = None
+                        if panel_file and st.session_state.last_panel_file != panel_id:
+                            panel_future = executor.submit(parse_panel_genes, panel_file.getvalue())
+                        coverage_bytes, basename = preprocess_excel_cached(file_bytes, raw_excel.name)
+                        if panel_future is not None:
+                            # A bad panel must not fail the coverage upload; leaving it unrecorded
+                            # lets the panel tab re-read the file and report its own error
+                            try:
+                                store_panel_genes(panel_id, panel_future.result())
+                            except Exception:
+                                pass
                     
                     progress.progress(80, "Generating CSV...")
-                    st.session_state.coverage_data = coverage_df
+                    coverage_df = pd.read_parquet(io.BytesIO(coverage_bytes))
+                    st.session_state.coverage_data = use_arrow_strings(coverage_df)
                     st.session_state.file_basename = basename
-                    st.session_state.processed_csv = coverage_df.to_csv(index=False)
+                    st.session_state.processed_csv = coverage_df.to_csv(index=False).encode('utf-8')
                     st.session_state.last_processed_file = file_id
                     
                     progress.progress(100, "Complete!")
@@ -310,13 +761,13 @@ with col1:
         
         if coverage_file:
             st.session_state.file_basename = os.path.splitext(coverage_file.name)[0]
-            df = pd.read_csv(coverage_file)
-            df.columns = df.columns.str.strip()
+            df = read_coverage_csv(coverage_file.getvalue())
             
-            coverage_col = next((col for col in ['% 1x', '%1x', '% 1x '] if col in df.columns), None)
+            # Accept any spacing/case variant of '% 1x' and store it under that canonical name
+            coverage_col = next((col for col in df.columns if col.replace(' ', '').lower() == '%1x'), None)
             
             if coverage_col:
-                st.session_state.coverage_data = df
+                st.session_state.coverage_data = use_arrow_strings(df.rename(columns={coverage_col: '% 1x'}))
                 st.success(f"✅ {len(df)} records")
             else:
                 st.error("❌ No coverage column found")
@@ -334,7 +785,7 @@ with col1:
         if mito_file:
             try:
                 # Load mito file with header in row 2 (skip first row)
-                mito_df = pd.read_excel(mito_file, header=1)
+                mito_df = read_mito_sheet(mito_file.getvalue())
                 
                 # Strip all column names of leading/trailing spaces
                 mito_df.columns = mito_df.columns.str.strip()
@@ -348,7 +799,8 @@ with col1:
                     st.session_state.mito_data = None
                 else:
                     mito_percent_col = mito_cols[0]
-                    st.write(f"DEBUG - Using column: '{mito_percent_col}'")
+                    if DEBUG:
+                        st.write(f"DEBUG - Using column: '{mito_percent_col}'")
                     
                     # Rename to standard name
                     mito_df = mito_df.rename(columns={mito_percent_col: '% 1x'})
@@ -382,8 +834,8 @@ with col1:
                         # Remove empty gene names
                         mito_df = mito_df[mito_df['Gene_ID'].str.strip() != '']
                         
-                        # DEBUG: Show sample data
-                        st.write(mito_df.head())
+                        if DEBUG:
+                            st.write(mito_df.head())
                         
                         st.session_state.mito_data = mito_df
                         st.success(f"✅ Loaded {len(mito_df)} mitochondrial genes")
@@ -403,26 +855,27 @@ with col2:
     with tab1:
         panel_file = st.file_uploader("Choose Excel", type=['xlsx', 'xls'], key='panel')
         if panel_file:
-            panel_df = pd.read_excel(panel_file)
-            if 'GENE' in panel_df.columns:
-                genes = panel_df['GENE'].dropna().unique().tolist()
-                st.session_state.panel_genes = genes
+            panel_id = f"{panel_file.name}_{panel_file.size}"
+            if st.session_state.last_panel_file != panel_id:
+                store_panel_genes(panel_id, read_panel_genes(panel_file.getvalue()))
+            
+            genes = st.session_state.panel_file_genes
+            if genes is not None:
                 st.success(f"✅ {len(genes)} genes")
             else:
                 st.error("❌ No GENE column")
     
     with tab2:
         gene_text = st.text_area(
-            "Paste genes (newline, comma, or space separated)",
+            "Paste genes (newline, comma, semicolon, or space separated)",
             height=150,
             placeholder="BRCA1 BRCA2 TP53\nEGFR, KRAS\nTP53"
         )
         
         if st.button("Load Genes", use_container_width=True):
-            genes = parse_gene_list(gene_text)
+            genes, duplicates_removed = parse_gene_list(gene_text)
             if genes:
                 st.session_state.panel_genes = genes
-                duplicates_removed = len(gene_text.split()) - len(genes)
                 if duplicates_removed > 0:
                     st.success(f"✅ {len(genes)} unique genes ({duplicates_removed} duplicates removed)")
                 else:
@@ -435,19 +888,7 @@ if st.session_state.coverage_data is not None and st.session_state.panel_genes:
     df = st.session_state.coverage_data
     panel_genes = st.session_state.panel_genes
     
-    coverage_col = next((col for col in ['% 1x', '%1x', '% 1x '] if col in df.columns), None)
-    if not coverage_col:
-        st.error("Coverage column not found")
-        st.stop()
-    
-    df_filtered = df[df['Gene_Name'].isin(panel_genes) | df['Ref Name'].isin(panel_genes)].copy()
-    df_filtered['Gene_ID'] = df_filtered['Gene_Name'].fillna(df_filtered['Ref Name'])
-    df_filtered = df_filtered[~df_filtered['Gene_ID'].fillna('').str.startswith("Intron:")]
-    df_filtered['Perc_1x'] = pd.to_numeric(df_filtered[coverage_col], errors='coerce')
-    
-    df_grouped = df_filtered.groupby('Gene_ID', as_index=False)['Perc_1x'].mean()
-    df_grouped['Perc_1x'] = df_grouped['Perc_1x'].round(2)
-    df_grouped = df_grouped.sort_values('Gene_ID')
+    df_grouped = compute_grouped(df, tuple(panel_genes))
     
     st.session_state.filtered_data = df_grouped
     
@@ -484,35 +925,28 @@ if st.session_state.coverage_data is not None and st.session_state.panel_genes:
                         df_panel = df_panel.rename(columns={'Perc_1x': '% 1x'})
                         df_panel = df_panel.sort_values('Gene_ID')
                         
-                        # DEBUG: Verify column names match
+                        # Panel genes take precedence: only mito genes missing from the panel are appended
+                        mito_data = st.session_state.mito_data
+                        mito_extra = mito_data[~mito_data['Gene_ID'].isin(df_panel['Gene_ID'])]
+                        mito_extra = mito_extra.drop_duplicates(subset='Gene_ID', keep='first')
                         
                         # Now both dataframes have the same column name: '% 1x'
-                        df_final = pd.concat([
-                            df_panel,
-                            st.session_state.mito_data
-                        ], ignore_index=True)
+                        df_final = pd.concat([df_panel, mito_extra], ignore_index=True)
                         
-                        # DEBUG: Check after concat
-                        st.write(df_final.head(10))
+                        if DEBUG:
+                            st.write(df_final.head(10))
                         
-                        # Remove duplicates (keep first occurrence - panel genes take precedence)
-                        df_final = df_final.drop_duplicates(subset='Gene_ID', keep='first')
-                        
-                        st.info(f"📊 Combined: {len(df_panel)} panel genes + {len(st.session_state.mito_data)} mito genes = {len(df_final)} total")
+                        st.info(f"📊 Combined: {len(df_panel)} panel genes + {len(mito_data)} mito genes = {len(df_final)} total")
                     else:
                         # No mito data - just use panel data
                         df_final = df_grouped.copy()
                         df_final = df_final.rename(columns={'Perc_1x': '% 1x'})
                     
-                    # Verify the final dataframe
-                    st.write(df_final.head())
+                    if DEBUG:
+                        st.write(df_final.head())
                     
                     word_filename = f"{st.session_state.file_basename}_report.docx"
-                    doc = create_word_document_with_mito(df_final, word_filename)
-                    doc_bytes = io.BytesIO()
-                    doc.save(doc_bytes)
-                    doc_bytes.seek(0)
-                    st.session_state.doc_bytes = doc_bytes
+                    st.session_state.doc_bytes = create_word_bytes(df_final, word_filename)
                     st.session_state.word_filename = word_filename
                     st.success("✅ Ready!")
                 except Exception as e:
@@ -534,22 +968,21 @@ if st.session_state.coverage_data is not None and st.session_state.panel_genes:
         csv_filename = f"{st.session_state.file_basename}_filtered.csv"
         st.download_button(
             f"📊 {csv_filename}",
-            data=df_grouped.to_csv(index=False),
+            data=df_to_csv_bytes(df_grouped),
             file_name=csv_filename,
             mime="text/csv",
             use_container_width=True
         )
     
     with st.expander("👁️ View Genes"):
-        # Create styled HTML preview like before
-        preview_html = '<div style="background: white; padding: 1rem; border-radius: 8px; border: 1px solid #dee2e6; max-height: 300px; overflow-y: auto;">'
-        for _, row in df_grouped.iterrows():
-            if row['Perc_1x'] < 90:
-                preview_html += f'<span style="display: inline-block; padding: 0.3rem 0.6rem; margin: 0.2rem; background: #f8d7da; color: #721c24; border-radius: 4px; font-family: monospace; font-size: 0.9rem; font-weight: bold;"><i>{row["Gene_ID"]}</i> ({row["Perc_1x"]}%)</span>'
-            else:
-                preview_html += f'<span style="display: inline-block; padding: 0.3rem 0.6rem; margin: 0.2rem; background: #e9ecef; border-radius: 4px; font-family: monospace; font-size: 0.9rem;"><i>{row["Gene_ID"]}</i> ({row["Perc_1x"]}%)</span>'
-        preview_html += '</div>'
-        st.markdown(preview_html, unsafe_allow_html=True)
+        # Rendered by Streamlit's virtualized grid, so only the visible rows cost anything
+        st.dataframe(
+            df_grouped.style.apply(highlight_low_coverage, axis=None).format({'Perc_1x': '{:.2f}'}),
+            column_config={'Gene_ID': 'Gene', 'Perc_1x': 'Coverage (%)'},
+            hide_index=True,
+            use_container_width=True,
+            height=300
+        )
         st.caption("ℹ️ Genes with coverage below 90% are highlighted in red")
 
 st.divider()
@@ -583,14 +1016,12 @@ with st.expander("📦 Batch HTML Report Generator"):
                 
                 zip_buffer = io.BytesIO()
                 
-                with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                    for idx, csv_file in enumerate(batch_files):
-                        df = pd.read_csv(csv_file)
-                        patient_name = os.path.splitext(csv_file.name)[0]
-                        html_content = generate_html_report(df, patient_name)
-                        
-                        safe_filename = patient_name.replace(' ', '_').replace('/', '_')
-                        zip_file.writestr(f"coverage_{safe_filename}.html", html_content)
+                # Reports are independent, so they are built concurrently and written in upload order;
+                # HTML compresses well, and the fastest deflate level keeps most of that gain
+                with ThreadPoolExecutor(max_workers=min(len(batch_files), os.cpu_count() or 1)) as executor, \
+                        zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as zip_file:
+                    for idx, (report_name, html_content) in enumerate(executor.map(build_batch_report, batch_files)):
+                        zip_file.writestr(report_name, html_content)
                         
                         progress = int((idx + 1) / len(batch_files) * 100)
                         progress_bar.progress(progress / 100, f"Creating {idx + 1} of {len(batch_files)}...")
@@ -614,240 +1045,8 @@ with st.expander("📦 Batch HTML Report Generator"):
                 progress_bar.empty()
                 st.error(f"❌ Error: {str(e)}")
 
-def generate_html_report(df, patient_name):
-    """Generate interactive HTML report"""
-    
-    # Get gene column name
-    gene_col = 'Gene_ID' if 'Gene_ID' in df.columns else 'Gene_Name' if 'Gene_Name' in df.columns else df.columns[0]
-    coverage_col = 'Perc_1x' if 'Perc_1x' in df.columns else 'Coverage' if 'Coverage' in df.columns else df.columns[1]
-    
-    rows_html = []
-    for idx, row in df.iterrows():
-        gene = row.get(gene_col, '')
-        coverage = row.get(coverage_col, '')
-        rows_html.append(f"<tr><td>{idx + 1}</td><td>{gene}</td><td>{coverage}</td></tr>")
-    
-    table_rows = '\n'.join(rows_html)
-    avg_coverage = df[coverage_col].mean() if coverage_col in df.columns else 0
-    
-    html = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-  <meta charset="UTF-8">
-  <meta name="viewport" content="width=device-width, initial-scale=1.0">
-  <title>Gene Coverage Report - {patient_name}</title>
-  <style>
-    body {{
-      margin: 0;
-      font-family: Arial, sans-serif;
-      background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-      padding: 20px;
-    }}
-    .container {{
-      max-width: 1200px;
-      margin: 0 auto;
-      background: white;
-      border-radius: 15px;
-      padding: 30px;
-      box-shadow: 0 20px 60px rgba(0,0,0,0.3);
-    }}
-    .header {{
-      text-align: center;
-      margin-bottom: 30px;
-      padding-bottom: 20px;
-      border-bottom: 3px solid #667eea;
-    }}
-    .header h1 {{
-      color: #667eea;
-      margin: 0;
-      font-size: 2em;
-    }}
-    .patient-name {{
-      color: #666;
-      font-size: 1.2em;
-      margin-top: 10px;
-    }}
-    .controls {{
-      margin: 20px 0;
-      display: flex;
-      gap: 10px;
-      flex-wrap: wrap;
-      justify-content: center;
-    }}
-    input[type="text"] {{
-      padding: 10px 15px;
-      font-size: 14px;
-      border: 2px solid #667eea;
-      border-radius: 8px;
-      min-width: 300px;
-    }}
-    button {{
-      padding: 10px 20px;
-      background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-      color: white;
-      border: none;
-      border-radius: 8px;
-      cursor: pointer;
-      font-size: 14px;
-      font-weight: 600;
-      transition: transform 0.2s;
-    }}
-    button:hover {{
-      transform: translateY(-2px);
-      box-shadow: 0 5px 15px rgba(102, 126, 234, 0.4);
-    }}
-    .table-wrapper {{
-      max-height: 600px;
-      overflow-y: auto;
-      border: 2px solid #667eea;
-      border-radius: 10px;
-      margin-top: 20px;
-    }}
-    table {{
-      border-collapse: collapse;
-      width: 100%;
-    }}
-    th, td {{
-      border: 1px solid #dee2e6;
-      padding: 12px;
-      text-align: center;
-      font-size: 14px;
-    }}
-    th {{
-      background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-      color: white;
-      position: sticky;
-      top: 0;
-      font-weight: 600;
-      z-index: 10;
-    }}
-    tr:nth-child(even) {{
-      background-color: #f8f9fa;
-    }}
-    tr:hover {{
-      background-color: #e9ecef;
-    }}
-    .stats {{
-      display: flex;
-      gap: 20px;
-      justify-content: center;
-      margin: 20px 0;
-    }}
-    .stat-box {{
-      background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-      color: white;
-      padding: 15px 30px;
-      border-radius: 10px;
-      text-align: center;
-    }}
-    .stat-box h3 {{
-      margin: 0;
-      font-size: 2em;
-    }}
-    .stat-box p {{
-      margin: 5px 0 0 0;
-      opacity: 0.9;
-    }}
-    @media only screen and (max-width: 600px) {{
-      .table-wrapper {{ max-height: 400px; }}
-      table {{ font-size: 12px; }}
-      .stats {{ flex-direction: column; }}
-    }}
-  </style>
-</head>
-<body>
-  <div class="container">
-    <div class="header">
-      <h1>🧬 Gene Coverage Report</h1>
-      <div class="patient-name">{patient_name}</div>
-    </div>
-
-    <div class="stats">
-      <div class="stat-box">
-        <h3 id="totalGenes">{len(df)}</h3>
-        <p>Total Genes</p>
-      </div>
-      <div class="stat-box">
-        <h3 id="avgCoverage">{avg_coverage:.2f}%</h3>
-        <p>Average Coverage</p>
-      </div>
-    </div>
-
-    <div class="controls">
-      <input type="text" id="searchInput" placeholder="🔍 Search by Gene..." />
-      <button onclick="sortTable(true)">↑ Ascending</button>
-      <button onclick="sortTable(false)">↓ Descending</button>
-      <button onclick="downloadCSV()">📥 Download CSV</button>
-    </div>
-
-    <div class="table-wrapper">
-      <table id="dataTable">
-        <thead>
-          <tr>
-            <th>S.No</th>
-            <th>Gene</th>
-            <th>Coverage (%)</th>
-          </tr>
-        </thead>
-        <tbody>
-          {table_rows}
-        </tbody>
-      </table>
-    </div>
-  </div>
-
-  <script>
-    const searchInput = document.getElementById('searchInput');
-    const tbody = document.querySelector('tbody');
-    let rows = Array.from(tbody.querySelectorAll('tr'));
-
-    searchInput.addEventListener('keyup', function(e) {{
-      const searchText = e.target.value.toLowerCase();
-      rows.forEach(row => {{
-        const found = Array.from(row.cells).some(cell => 
-          cell.textContent.toLowerCase().includes(searchText)
-        );
-        row.style.display = found ? '' : 'none';
-      }});
-      updateStats();
-    }});
-
-    function sortTable(ascending) {{
-      const sortedRows = rows.slice().sort((a, b) => {{
-        const aVal = parseFloat(a.cells[2].textContent) || 0;
-        const bVal = parseFloat(b.cells[2].textContent) || 0;
-        return ascending ? aVal - bVal : bVal - aVal;
-      }});
-      sortedRows.forEach((row, i) => {{
-        row.cells[0].textContent = i + 1;
-        tbody.appendChild(row);
-      }});
-      rows = sortedRows;
-    }}
-
-    function updateStats() {{
-      const visible = rows.filter(row => row.style.display !== 'none');
-      document.getElementById('totalGenes').textContent = visible.length;
-    }}
-
-    function downloadCSV() {{
-      const visible = rows.filter(row => row.style.display !== 'none');
-      let csv = "S.No,Gene,Coverage\\n";
-      visible.forEach(row => {{
-        const cells = Array.from(row.cells).map(c => '"' + c.textContent.trim() + '"');
-        csv += cells.join(',') + '\\n';
-      }});
-      const blob = new Blob([csv], {{ type: 'text/csv' }});
-      const link = document.createElement('a');
-      link.href = URL.createObjectURL(blob);
-      link.download = 'coverage_{patient_name}.csv';
-      link.click();
-    }}
-  </script>
-</body>
-</html>"""
-    
-    return html
-
 st.divider()
-st.caption("All processing happens on the server. Data is not stored permanently.")
+if DISK_CACHE:
+    st.caption("All processing happens on the server. Processed coverage tables are cached on the server's disk.")
+else:
+    st.caption("All processing happens on the server. Data is not stored permanently.")